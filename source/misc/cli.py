@@ -31,6 +31,8 @@ def argument_parser():
     parser.add_argument('--ic-noise-rate', type=float, default=0.0, help='Applied noise to the initial condition for further robustness.')
     parser.add_argument('--crate-lb', type=float, default=0.0, help='Lower bound for the contraction rate. Defaults to 0.0 for continuous and 1 for discrete.')
     parser.add_argument('--loss', type=str, default='mse', help='Training loss to be selected between "dtw" and "mse". Default is "mse".')
+    parser.add_argument('--compile-rhs', action='store_true', default=False, help='Compile the ODE right-hand side with torch.compile. Only relevant for the continuous model.')
+    parser.add_argument('--amp', action='store_true', default=False, help='Run the training forward pass under bfloat16 autocast. The constrained matrices and the optimizer stay in full precision.')
 
     # dataset args
     parser.add_argument('--expert', type=str, default='lasa', help='Expert type among ["lasa", "robomimic"]. Default is "lasa".')
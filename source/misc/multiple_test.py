@@ -70,19 +70,22 @@ if __name__ == '__main__':
             y_init, expert_trajectories = next(iter(dataloader))
             batch_size = y_init.size(0)
 
-            for _ in range(num_rollouts):
-
-                # set noisy initial condition for test
-                y_init_noisy = y_init - y_init_std * (2 * (torch.rand(y_init.shape, device=args.device) - 0.5))
-
-                # input is set to zero
-                u_in = torch.zeros((batch_size, 1, experiment_data['model']['model_params']['dim_in']), device=args.device)
-
-                # generate rollouts
-                rollouts_noisy = ren_module.forward_trajectory(u_in, y_init_noisy, rollouts_horizon).cpu()
-                rollouts_fixed = ren_module.forward_trajectory(u_in, y_init, rollouts_horizon).cpu()
-
-                # add to plots
+            # stack the fixed and all noisy initial conditions along the batch axis and run
+            # one vectorized solve instead of a Python loop of per-rollout solver calls
+            y_init_noisy = y_init.repeat(num_rollouts, 1, 1) - \
+                y_init_std * (2 * (torch.rand((num_rollouts * batch_size, *y_init.shape[1:]),
+                                              device=args.device) - 0.5))
+            y_init_stacked = torch.cat((y_init, y_init_noisy), dim=0)
+
+            # input is set to zero
+            u_in = torch.zeros((y_init_stacked.size(0), 1, experiment_data['model']['model_params']['dim_in']), device=args.device)
+
+            # generate rollouts
+            rollouts = ren_module.forward_trajectory(u_in, y_init_stacked, rollouts_horizon).cpu()
+            rollouts_fixed = rollouts[:batch_size]
+
+            # add to plots
+            for rollouts_noisy in torch.split(rollouts[batch_size:], batch_size, dim=0):
                 policy_rollouts_o.append(rollouts_fixed)
                 policy_rollouts_n.append(smooth_trajectory(rollouts_noisy))
 
@@ -85,19 +85,23 @@ class REN(nn.Module, ABC):
             self.bijection_net = BijectionNet(self.dim_out, self.num_bijection_layers,
                                               self.num_bijection_layers, device=device)
 
-        # bias
+        # bias, registered as buffers when non-trainable so to(device) moves them along
         if self.add_bias:
             self.bx = nn.Parameter(torch.randn(dim_x, 1, device=device) * self.weight_init_std)
             self.bv = nn.Parameter(torch.randn(dim_v, 1, device=device) * self.weight_init_std)
             self.by = nn.Parameter(torch.randn(dim_out, 1, device=device) * self.weight_init_std)
         else:
-            self.bx = torch.zeros(dim_x, 1, device=device)
-            self.bv = torch.zeros(dim_v, 1, device=device)
-            self.by = torch.zeros(dim_out, 1, device=device)
+            self.register_buffer('bx', torch.zeros(dim_x, 1, device=device), persistent=False)
+            self.register_buffer('bv', torch.zeros(dim_v, 1, device=device), persistent=False)
+            self.register_buffer('by', torch.zeros(dim_out, 1, device=device), persistent=False)
 
         # initialize internal state
         self.x = torch.zeros(self.batch_size, 1, self.dim_x, device=self.device)
 
+        # cached pseudo-inverse of C2 for set_y_init
+        self._C2_pinv = None
+        self._C2_pinv_version = None
+
     def get_init_params(self):
         return {
             "dim_in": self.dim_in,
@@ -137,7 +141,15 @@ class REN(nn.Module, ABC):
         """
         # TODO: integerate the inverse of bijection layers if available
 
-        x_init = torch.linalg.lstsq(self.C2,  y_init.squeeze(1).T)[0].T.unsqueeze(1)
+        # reuse the cached pseudo-inverse of C2 between rollouts; training forwards recompute it
+        # so the initial condition keeps its gradient path through C2. The pseudo-inverse and
+        # the solve stay in full precision even under autocast, since pinv has no bf16 path
+        with torch.autocast(device_type=str(self.device).split(':')[0], enabled=False):
+            if torch.is_grad_enabled() or self._C2_pinv is None or self._C2_pinv_version != self.C2._version:
+                self._C2_pinv = torch.linalg.pinv(self.C2)
+                self._C2_pinv_version = self.C2._version
+
+            x_init = (self._C2_pinv @ y_init.squeeze(1).float().T).T.unsqueeze(1)
         self.set_x_init(x_init)
 
     @abstractmethod
@@ -145,6 +157,21 @@ class REN(nn.Module, ABC):
         """ Update non-trainable matrices according to the REN formulation to preserve contraction.
         """
 
+    def _refresh_model_param(self):
+        """ Recompute the constrained matrices only when needed.
+
+        Training forwards always recompute so the matrices stay attached to the current autograd
+        graph. No-grad forwards reuse the cached matrices until a parameter changes in-place,
+        e.g. through an optimizer step or a state-dict load.
+        """
+        versions = tuple(param._version for param in self.parameters())
+        if torch.is_grad_enabled() or versions != getattr(self, '_param_versions', None):
+            # the constraint parameterization stays in full precision even under autocast,
+            # since the Cholesky factorization is sensitive to reduced precision
+            with torch.autocast(device_type=str(self.device).split(':')[0], enabled=False):
+                self.update_model_param()
+            self._param_versions = versions
+
     @abstractmethod
     def forward_trajectory(self, u_in: torch.Tensor, y_init: torch.Tensor, horizon: int):
         """ Get a trajectory of forward passes.
@@ -7,12 +7,38 @@ import torch
 import torch.nn as nn
 import torch.nn.functional as F
 
-from torchdiffeq import odeint_adjoint as odeint
+from torch.utils.checkpoint import checkpoint
+from torchdiffeq import odeint
 from typing import Optional
 
 from source.model.ren import REN
 
 
+def _cren_rhs(x: torch.Tensor, pre_u: torch.Tensor, AB: torch.Tensor, C1: torch.Tensor,
+              D11: torch.Tensor, b_u: torch.Tensor) -> torch.Tensor:
+    """ Scripted RHS of the continuous REN so the pointwise chains fuse into few kernels.
+
+    The exogenous input is constant over the integration interval, so its contributions enter
+    precomputed: pre_u = D12 u + b_v for the implicit layer and b_u = B2 u + b_x for the state
+    evolution.
+    """
+    # state contribution to the implicit layer, computed once for all rows
+    pre = F.linear(x, C1) + pre_u
+
+    # forward substitution through the strictly lower-triangular D11, one fused gemv per row
+    w = torch.tanh(pre[:, :, 0:1])
+    for i in range(1, C1.size(0)):
+        v = pre[:, :, i:i + 1] + F.linear(w, D11[i:i + 1, :i])
+        w = torch.cat((w, torch.tanh(v)), dim=2)
+
+    # state evolution, with [A | B1] stacked so both matmuls run as one gemm
+    return F.linear(torch.cat((x, w), dim=2), AB) + b_u
+
+
+# scripted by default; compile_rhs swaps in a torch.compile'd version of the same function
+_cren_rhs_scripted = torch.jit.script(_cren_rhs)
+
+
 class CREN(REN):
     def __init__(self,
                  dim_in: int,
@@ -28,7 +54,9 @@ class CREN(REN):
                  device: Optional[str] = "cpu",
                  horizon: Optional[int] = None,
                  bijection: Optional[bool] = False,
-                 num_bijection_layers: Optional[int] = 0):
+                 num_bijection_layers: Optional[int] = 0,
+                 solver: Optional[str] = "rk4",
+                 step_size: Optional[float] = None):
         """ Initialize a recurrent equilibrium network. This can also be viewed as a single layer
         of a larger network.
 
@@ -48,10 +76,22 @@ class CREN(REN):
             posdef_tol (float, optional): Positive and negligible scalar to force positive definite matrices.
             contraction_rate_lb (float, optional): Lower bound on the contraction rate. Defaults to 0.
             device(str, optional): Pass the name of the device. Defaults to cpu.
+
+            solver (str, optional): Integration method passed to torchdiffeq. Fixed-step methods
+                ("rk4", "midpoint", "euler") keep the number of function evaluations deterministic
+                and avoid adaptive step-size control, which is overkill for these contractive
+                dynamics. Defaults to "rk4"; set to "dopri5" to restore adaptive stepping.
+            step_size (float, optional): Step size for fixed-step solvers. Defaults to None, which
+                uses one step per horizon sample.
         """
         super().__init__(dim_in, dim_out, dim_x, dim_v, batch_size, weight_init_std, linear_output, posdef_tol,
                          contraction_rate_lb, add_bias, device, horizon, bijection, num_bijection_layers)
 
+        # integration setup
+        self.solver = solver
+        self.step_size = step_size
+        self._rhs = _cren_rhs_scripted
+
         # auxiliary matrices
         self.Pstar = nn.Parameter(torch.randn(dim_x, dim_x, device=device) * self.weight_init_std)
         self.Chi = nn.Parameter(torch.randn(dim_x, dim_v, device=device) * self.weight_init_std)
@@ -63,29 +103,53 @@ class CREN(REN):
 
         # linear output setup
         if linear_output:
-            self.D21 = torch.zeros(dim_out, dim_v, device=device)
+            self.register_buffer('D21', torch.zeros(dim_out, dim_v, device=device), persistent=False)
         else:
             self.D21 = nn.Parameter(torch.randn(dim_out, dim_v, device=device) * self.weight_init_std)
 
         self.D22 = nn.Parameter(torch.randn(dim_out, dim_in, device=device) * self.weight_init_std)
 
-        # non-trainable matrices
-        self.A = torch.zeros(dim_x, dim_x, device=device)
-        self.D11 = torch.zeros(dim_v, dim_v, device=device)
-        self.C1 = torch.zeros(dim_v, dim_x, device=device)
-        self.B1 = torch.zeros(dim_x, dim_v, device=device)
-        self.P = torch.zeros(dim_x, dim_x, device=device)
+        # non-trainable matrices, registered as non-persistent buffers so to(device) moves them
+        # without bloating checkpoints; update_model_param recomputes them from the parameters
+        self.register_buffer('A', torch.zeros(dim_x, dim_x, device=device), persistent=False)
+        self.register_buffer('D11', torch.zeros(dim_v, dim_v, device=device), persistent=False)
+        self.register_buffer('C1', torch.zeros(dim_v, dim_x, device=device), persistent=False)
+        self.register_buffer('B1', torch.zeros(dim_x, dim_v, device=device), persistent=False)
+        self.register_buffer('P', torch.zeros(dim_x, dim_x, device=device), persistent=False)
+
+        # stacked [A | B1] used by the RHS so the state evolution runs as a single gemm
+        self.register_buffer('AB', torch.zeros(dim_x, dim_x + dim_v, device=device), persistent=False)
+
+        # zero exogenous input, allocated once and resized with the batch in forward_trajectory
+        self.register_buffer('u_in', torch.zeros(batch_size, 1, dim_in, device=device), persistent=False)
+
+        # constant identity matrices reused by update_model_param
+        self.register_buffer('_eye_x', torch.eye(dim_x, device=device), persistent=False)
+        self.register_buffer('_eye_xv', torch.eye(dim_x + dim_v, device=device), persistent=False)
 
         # update model parameters
         self.update_model_param()
 
+    def get_init_params(self):
+        params = super().get_init_params()
+        params.update({"solver": self.solver, "step_size": self.step_size})
+        return params
+
+    def compile_rhs(self, mode: Optional[str] = "reduce-overhead"):
+        """ Swap the scripted RHS for a torch.compile'd one.
+
+        The state shape is fixed over a training run, so the RHS compiles with dynamic=False and
+        the inductor backend can fuse and specialize the whole graph.
+        """
+        self._rhs = torch.compile(_cren_rhs, mode=mode, dynamic=False)
+
     def update_model_param(self):
         """ Used at the end of each batch training for the update of the constrained matrices.
         """
-        P = 0.5 * F.linear(self.Pstar, self.Pstar) + self.epsilon * torch.eye(self.dim_x, device=self.device)
+        P = 0.5 * F.linear(self.Pstar, self.Pstar) + self.epsilon * self._eye_x
         self.P = P
 
-        H = F.linear(self.X, self.X) + self.epsilon * torch.eye(self.dim_x + self.dim_v, device=self.device)
+        H = F.linear(self.X, self.X) + self.epsilon * self._eye_xv
 
         # partition of H into [H1 H2; H3 H4]
         h1, h2 = torch.split(H, (self.dim_x, self.dim_v), dim=0)
@@ -93,15 +157,21 @@ class CREN(REN):
         H3, H4 = torch.split(h2, (self.dim_x, self.dim_v), dim=1)
 
         Y = -0.5 * (H1 + self.contraction_rate_lb * P + self.Y1 - self.Y1.T)
-        Lambda = 0.5 * torch.diag_embed(torch.diagonal(H4))
 
-        self.A = F.linear(torch.inverse(P), Y.T)
-        self.D11 = -F.linear(torch.inverse(Lambda), torch.tril(H4, -1).T)
-        self.C1 = F.linear(torch.inverse(Lambda), self.Chi)
-        self.eye = torch.eye(self.dim_v, device=self.device)
+        # factor the SPD matrix P once and reuse it, instead of forming two explicit inverses
+        L = torch.linalg.cholesky(P)
+        self.A = torch.cholesky_solve(Y, L)
+
+        # Lambda = 0.5 * diag(diag(H4)) is diagonal, so applying its inverse is a row scaling
+        lambda_inv = (2.0 / torch.diagonal(H4)).unsqueeze(1)
+        self.D11 = -lambda_inv * torch.tril(H4, -1)
+        self.C1 = lambda_inv * self.Chi.T
 
         Z = -H2 - self.Chi
-        self.B1 = F.linear(torch.inverse(P), Z.T)
+        self.B1 = torch.cholesky_solve(Z, L)
+
+        # stacked state-evolution matrix for the fused gemm in the RHS
+        self.AB = torch.cat((self.A, self.B1), dim=1)
 
     def forward(self, t, x):
         """ Forward pass of the network.
@@ -113,17 +183,9 @@ class CREN(REN):
         Returns:
             torch.Tensor: Time derivative of x.
         """
-        u_in = torch.zeros(self.x.size(0), 1, self.dim_in, device=self.device)
-        w = torch.zeros(self.x.size(0), 1, self.dim_v, device=self.device)
-
-        for i in range(self.dim_v):
-            v = F.linear(x, self.C1[i, :]) + F.linear(w, self.D11[i, :]) + F.linear(u_in, self.D12[i, :])
-            w = w + (self.eye[i, :] * self.act(v)).unsqueeze(1)
-
-        # state evolution
-        x_dot = F.linear(x, self.A) + F.linear(w, self.B1) + F.linear(u_in, self.B2)
-
-        return x_dot
+        pre_u = F.linear(self.u_in, self.D12) + self.bv.view(-1)
+        b_u = F.linear(self.u_in, self.B2) + self.bx.view(-1)
+        return self._rhs(x, pre_u, self.AB, self.C1, self.D11, b_u)
 
     def output(self, x):
         """ Calculates the output yt given the state xi and the input u.
@@ -152,17 +214,81 @@ class CREN(REN):
             horizon (int, optional): Length of the forward trajectory. Defaults to 20.
         """
 
+        self._refresh_model_param()
         self.set_y_init(y_init)
 
+        # refresh the cached zero input only when the batch size changes
+        if self.u_in.size(0) != self.x.size(0):
+            self.u_in = torch.zeros(self.x.size(0), 1, self.dim_in, device=self.device)
+
         # discrete horizon
         self.horizon = horizon
         time_vector = torch.linspace(0.0, 1.0, horizon, device=self.device)
 
-        x_sim = odeint(self, self.x, time_vector, method='dopri5', rtol=1e-4, atol=1e-4,
-                       adjoint_rtol=1e-4, adjoint_atol=1e-4) # x_sim has dimension of (horizon, batch_size, 1, dim_x)
+        # direct backprop through the solver, checkpointing sub-intervals to bound activation
+        # memory; the adjoint backward solve is unstable for dopri5 and doubles the solver work
+        x_sim = self._solve(time_vector) # x_sim has dimension of (horizon, batch_size, 1, dim_x)
 
-        x_sim = torch.swapaxes(x_sim, 0, 1).squeeze(2)
+        # move the batch axis first with an explicit permute and make the result contiguous,
+        # so the output matmul and downstream consumers get densely laid-out memory
+        x_sim = x_sim.squeeze(2).permute(1, 0, 2).contiguous()
         out = self.output(x_sim)
         return out
 
+    def _solve(self, time_vector: torch.Tensor, num_segments: Optional[int] = 4):
+        """ Integrate the state over time_vector in checkpointed segments.
+
+        Args:
+            time_vector (torch.Tensor): Monotone time grid to report the state on.
+            num_segments (int, optional): Number of checkpointed sub-intervals. Defaults to 4.
+        """
+        x_init = self.x
+
+        # input and bias contributions are constant over the interval, computed once per solve
+        pre_u = F.linear(self.u_in, self.D12) + self.bv.view(-1)
+        b_u = F.linear(self.u_in, self.B2) + self.bx.view(-1)
+
+        if not torch.is_grad_enabled():
+            return self._solve_segment(x_init, time_vector, pre_u, self.AB, self.C1, self.D11, b_u)
+
+        x_segments = []
+        for k, t_segment in enumerate(torch.tensor_split(time_vector, num_segments)):
+            if t_segment.numel() == 0:
+                continue
+
+            # each segment restarts from the end state of the previous one
+            if k > 0:
+                t_segment = torch.cat((x_segments[-1][1], t_segment))
+
+            # the derived matrices are checkpoint inputs so their shared update_model_param
+            # graph is traversed once by the outer backward rather than once per segment
+            x_segment = checkpoint(self._solve_segment, x_init, t_segment, pre_u, self.AB,
+                                   self.C1, self.D11, b_u, use_reentrant=True)
+            x_segments.append((x_segment if k == 0 else x_segment[1:], t_segment[-1:]))
+            x_init = x_segment[-1]
+
+        return torch.cat([x_segment for x_segment, _ in x_segments], dim=0)
+
+    def _solve_segment(self, x_init: torch.Tensor, t_segment: torch.Tensor,
+                       pre_u: Optional[torch.Tensor] = None, AB: Optional[torch.Tensor] = None,
+                       C1: Optional[torch.Tensor] = None, D11: Optional[torch.Tensor] = None,
+                       b_u: Optional[torch.Tensor] = None):
+        if AB is None:
+            return odeint(self, x_init, t_segment, **self._solver_options())
+
+        def rhs(t, x):
+            return self._rhs(x, pre_u, AB, C1, D11, b_u)
+
+        return odeint(rhs, x_init, t_segment, **self._solver_options())
+
+    def _solver_options(self):
+        """ Keyword arguments for odeint, fixed-step unless an adaptive solver was requested. """
+        if self.solver == "dopri5":
+            return {"method": "dopri5", "rtol": 1e-4, "atol": 1e-4}
+
+        # the default step lands exactly on the reporting grid, so no interpolation is needed
+        # and checkpointed sub-interval solves restart on solver steps
+        step_size = self.step_size if self.step_size is not None else 1.0 / (self.horizon - 1)
+        return {"method": self.solver, "options": {"step_size": step_size}}
+
 
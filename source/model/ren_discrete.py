@@ -91,9 +91,9 @@ class DREN(REN):
         if self.linear_output:
             # set D21 to zero
             self.training_param_names.remove('D21') # not trainable anymore
-            self.D21 = torch.zeros(*self.D21_shape, device=self.device) * self.weight_init_std
+            self.register_buffer('D21', torch.zeros(*self.D21_shape, device=self.device), persistent=False)
             # set D22 to zero
-            self.D22 = torch.zeros(*self.D22_shape, device=self.device) * self.weight_init_std
+            self.register_buffer('D22', torch.zeros(*self.D22_shape, device=self.device), persistent=False)
             self.training_param_names.remove('D22') # not trainable anymore
 
         for name in self.training_param_names:
@@ -102,13 +102,18 @@ class DREN(REN):
             # define each param as nn.Parameter
             setattr(self, name, nn.Parameter((torch.randn(*shape, device=self.device) * self.weight_init_std)))
 
-        # auxiliary elements
-        self.F = torch.zeros(dim_x, dim_x, device=self.device)
-        self.B1 = torch.zeros(dim_x, dim_v, device=self.device)
-        self.E = torch.zeros(dim_x, dim_x, device=self.device)
-        self.Lambda = torch.ones(dim_v, device=self.device)
-        self.C1 = torch.zeros(dim_v, dim_x, device=self.device)
-        self.D11 = torch.zeros(dim_v, dim_v, device=self.device)
+        # auxiliary elements, registered as non-persistent buffers so to(device) moves them
+        # without bloating checkpoints; update_model_param recomputes them from the parameters
+        self.register_buffer('F', torch.zeros(dim_x, dim_x, device=self.device), persistent=False)
+        self.register_buffer('B1', torch.zeros(dim_x, dim_v, device=self.device), persistent=False)
+        self.register_buffer('E', torch.zeros(dim_x, dim_x, device=self.device), persistent=False)
+        self.register_buffer('Lambda', torch.ones(dim_v, device=self.device), persistent=False)
+        self.register_buffer('C1', torch.zeros(dim_v, dim_x, device=self.device), persistent=False)
+        self.register_buffer('D11', torch.zeros(dim_v, dim_v, device=self.device), persistent=False)
+
+        # constant identity matrices reused by update_model_param and forward
+        self.register_buffer('eye', torch.eye(dim_v, device=self.device), persistent=False)
+        self.register_buffer('_eye_xxv', torch.eye(2 * dim_x + dim_v, device=self.device), persistent=False)
 
         # update non-trainable model params
         self.update_model_param()
@@ -117,7 +122,7 @@ class DREN(REN):
         """ Update non-trainable matrices according to the REN formulation to preserve contraction.
         """
         # dependent params
-        H = torch.matmul(self.X.T, self.X) + self.epsilon * torch.eye(2 * self.dim_x + self.dim_v, device=self.device)
+        H = torch.matmul(self.X.T, self.X) + self.epsilon * self._eye_xxv
         h1, h2, h3 = torch.split(H, [self.dim_x, self.dim_v, self.dim_x], dim=0)
         H11, H12, H13 = torch.split(h1, [self.dim_x, self.dim_v, self.dim_x], dim=1)
         H21, H22, _ = torch.split(h2, [self.dim_x, self.dim_v, self.dim_x], dim=1)
@@ -130,7 +135,6 @@ class DREN(REN):
 
         # nn output
         self.E = 0.5 * (H11 + self.contraction_rate_lb * P + self.Y - self.Y.T)
-        self.eye = torch.eye(self.dim_v, device=self.device)
 
         # v signal
         # NOTE: change the following lines when you don't want a strictly acyclic REN!
@@ -184,6 +188,7 @@ class DREN(REN):
             horizon (int, optional): Length of the forward trajectory. Defaults to 20.
         """
 
+        self._refresh_model_param()
         self.set_y_init(y_init)
         self.horizon = horizon
 
@@ -1,4 +1,3 @@
-import copy
 import torch
 import torch.nn as nn
 
@@ -23,7 +22,8 @@ def train_ren_model(model: Union[DREN, CREN],
                     patience_epoch: int,
                     log_epoch: int,
                     writer: SummaryWriter,
-                    criterion = nn.Module):
+                    criterion = nn.Module,
+                    amp: bool = False):
     """ Train a discrete or continuous ren model.
 
     Args:
@@ -42,6 +42,8 @@ def train_ren_model(model: Union[DREN, CREN],
 
         writer (SummaryWriter): TensorBoard writer for logging metrics and other information.
         criterion (nn.Module): Loss function used for training the network.
+        amp (bool, optional): Run the forward pass and loss under bfloat16 autocast. The
+            constrained matrices and the optimizer remain in full precision. Defaults to False.
     """
 
     print(f'Training { type(model).__name__} model for {total_epochs} epochs and horizon {horizon}')
@@ -52,7 +54,7 @@ def train_ren_model(model: Union[DREN, CREN],
     # temps
     trajectories, train_losses = [], []
     best_model_state_dict = None
-    best_loss = torch.tensor(float('inf'))
+    best_loss = float('inf')
     best_train_epoch = 0
 
     # lr scheduler
@@ -66,6 +68,16 @@ def train_ren_model(model: Union[DREN, CREN],
     patience_epoch = (total_epochs // 5) if patience_epoch is None else patience_epoch
     log_epoch = (total_epochs // 10) if log_epoch is None else log_epoch
 
+    # input is set to zero, allocated once and reused across iterations
+    u_in = torch.zeros((0, 1, model.dim_in), device=model.device)
+
+    # mixed-precision setup, bf16 needs no gradient scaling
+    autocast_device = str(model.device).split(':')[0]
+
+    # tensorboard scalars are buffered and written in batches
+    scalar_buffer = []
+    scalar_flush_every = 50
+
     # training epochs
     step = 0
     for epoch in range(total_epochs):
@@ -73,33 +85,46 @@ def train_ren_model(model: Union[DREN, CREN],
             # zero grad
             optimizer.zero_grad()
 
-            # input is set to zero
-            u_in = torch.zeros((y_init.size(0), 1, model.dim_in), device=model.device)
-
-            # forward pass
-            out = model.forward_trajectory(u_in, y_init, horizon)
-
-            # loss
-            loss = criterion(out, expert_trajectory).mean()
+            # resize the zero input only when the batch size changes
+            if u_in.size(0) != y_init.size(0):
+                u_in = torch.zeros((y_init.size(0), 1, model.dim_in), device=model.device)
 
-            train_losses.append(loss.item())
+            # forward pass and loss, optionally under bf16 autocast
+            with torch.autocast(device_type=autocast_device, dtype=torch.bfloat16, enabled=amp):
+                out = model.forward_trajectory(u_in, y_init, horizon)
+                loss = criterion(out, expert_trajectory).mean()
 
-            # best model
-            if best_loss - loss > 5e-6:
-                best_model_state_dict = copy.deepcopy(model.state_dict())
-                best_loss = loss.item()
+            # backward first so the device keeps working while the host reads the loss;
+            # the single item() below is the only sync point of the iteration
+            loss.backward()
+            loss_value = loss.item()
+
+            train_losses.append(loss_value)
+
+            # best model, snapshot into persistent cpu buffers before the optimizer step
+            # overwrites the weights that produced this loss
+            if best_loss - loss_value > 5e-6:
+                if best_model_state_dict is None:
+                    best_model_state_dict = {key: value.detach().cpu().clone()
+                                             for key, value in model.state_dict().items()}
+                else:
+                    for key, value in model.state_dict().items():
+                        best_model_state_dict[key].copy_(value, non_blocking=True)
+                best_loss = loss_value
                 best_train_epoch = epoch
-                best_out = out.detach().cpu()
-
-            # tensorboard
-            writer.add_scalars('Loss', {'Training': best_loss}, step + 1)
-            writer.flush()
+                best_out = out.detach()
+
+            # tensorboard, buffered to avoid serializing and flushing on every step
+            scalar_buffer.append((step + 1, best_loss))
+            if len(scalar_buffer) >= scalar_flush_every:
+                for scalar_step, scalar_value in scalar_buffer:
+                    writer.add_scalars('Loss', {'Training': scalar_value}, scalar_step)
+                scalar_buffer.clear()
             step += 1
 
-            # backward and param updates
-            loss.backward()
+            # param updates; the constrained matrices are refreshed lazily inside the next
+            # forward_trajectory call
             optimizer.step()
-            model.update_model_param()
 
         # check no progress
         if epoch - best_train_epoch > patience_epoch:
@@ -114,6 +139,17 @@ def train_ren_model(model: Union[DREN, CREN],
         # step the lr scheduler
         scheduler.step()
 
+    # drain the remaining buffered scalars
+    for scalar_step, scalar_value in scalar_buffer:
+        writer.add_scalars('Loss', {'Training': scalar_value}, scalar_step)
+    writer.flush()
+
+    # the logged trajectories stay on the training device during the loop to avoid per-log
+    # host syncs; materialize them on cpu only once for saving and plotting. The float cast
+    # keeps the saved data fp32 when the forward ran under bf16 autocast, since numpy
+    # cannot represent bfloat16
+    trajectories = [trajectory.float().cpu() for trajectory in trajectories]
+
     # training time and best results
     training_time = datetime.now() - start_time
     print(f'Training Concluded in {training_time} | Best Loss: {best_loss:.8f} | Best Epoch: {best_train_epoch}')
@@ -107,28 +107,24 @@ if __name__ == '__main__':
             u_in = torch.zeros((batch_size, 1, experiment_data['model']['model_params']['dim_in']), device=args.device)
 
             if y_inits_saved is None or args.new_ic_test:
-                # initialize a list to store y_init_noisy
-                y_init_noisy_list = []
-
                 # generate original rollouts
                 rollouts_fixed = ren_module.forward_trajectory(u_in, y_init, rollouts_horizon).cpu()
                 policy_rollouts_o.append(smooth_trajectory(rollouts_fixed))
-                y_init_noisy_list.append(y_init)
-
-                for _ in range(num_rollouts):
-
-                    # set noisy initial condition for test
-                    y_init_noisy = y_init + y_init_std * (2 * (torch.rand(y_init.shape, device=args.device) - 0.5))
 
-                    # generate rollouts
-                    rollouts_noisy = ren_module.forward_trajectory(u_in, y_init_noisy, rollouts_horizon).cpu()
+                # stack all noisy initial conditions and run a single batched solve instead of
+                # one solver call per rollout
+                y_init_noisy = y_init.repeat(num_rollouts, 1, 1) + \
+                    y_init_std * (2 * (torch.rand((num_rollouts * batch_size, *y_init.shape[1:]),
+                                                  device=args.device) - 0.5))
+                u_in_noisy = torch.zeros((y_init_noisy.size(0), 1, experiment_data['model']['model_params']['dim_in']), device=args.device)
+                rollouts_noisy = ren_module.forward_trajectory(u_in_noisy, y_init_noisy, rollouts_horizon).cpu()
 
-                    # add to plots
-                    policy_rollouts_n.append(smooth_trajectory(rollouts_noisy))
-                    y_init_noisy_list.append(y_init_noisy)
+                # split back into per-rollout batches for plotting
+                for rollouts in torch.split(rollouts_noisy, batch_size, dim=0):
+                    policy_rollouts_n.append(smooth_trajectory(rollouts))
 
                 # save the array
-                y_init_noisy_array = torch.cat(y_init_noisy_list, dim=0)
+                y_init_noisy_array = torch.cat((y_init, y_init_noisy), dim=0)
                 torch.save(y_init_noisy_array, os.path.join(writer_dir, 'y_init.pt'))
 
             else:
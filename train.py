@@ -77,6 +77,10 @@ if __name__ == '__main__':
     # send the model to device
     model.to(device=args.device)
 
+    # optionally compile the ODE right-hand side, only relevant for the continuous model
+    if args.compile_rhs and args.model_type == 'continuous':
+        model.compile_rhs()
+
     # experiment log setup
     timestamp = datetime.now().strftime('%d-%H%M')
     experiment_name = f'{type(model).__name__.lower()}-{args.expert}-{args.motion_shape}' \
@@ -97,7 +101,8 @@ if __name__ == '__main__':
                                             lr_end_factor=args.lr_end_factor,
                                             patience_epoch=args.patience_epoch,
                                             log_epoch=args.log_epoch,
-                                            criterion=loss)
+                                            criterion=loss,
+                                            amp=args.amp)
 
     ren_data["expert"] = args.expert
     ren_data["num_expert_samples"] = args.num_expert_samples